@@ -12,23 +12,220 @@ The messages list format expected by Claude:
     ...
   ]
 Messages MUST alternate user/assistant. The list MUST start with a user turn.
+
+Tool use: if Claude answers with tool_use blocks, the tools run concurrently
+via the ToolRegistry (agent/tools.py) and the results are sent back on a
+streamed request, up to MAX_TOOL_ROUNDS times per turn. Only the user text
+and Claude's final spoken reply are kept in history, so trimming can never
+split a tool_use from its tool_result.
+
+Model routing: ModelRouter picks a tier (model, token cap, length hint) per
+turn from cheap local features of the transcript and conversation state, so
+"what time is it" doesn't pay the same cost as "explain how vaccines work".
+ROUTING_POLICY=fixed restores the single MODEL / MAX_TOKENS behaviour.
+
+Persistence: with HISTORY_PERSIST on, every completed turn is handed to a
+ConversationStore (agent/history_store.py) and the last MAX_HISTORY_TURNS
+turns are restored at startup. If the store can't be set up (read-only or
+full SD card, bad HISTORY_DIR) the agent runs without persistence.
 """
+import collections
+import re
+import statistics
+import time
+
 import anthropic
 from config.settings import settings
+from agent.history_store import ConversationStore
+from agent.tools import LATENCY_SAMPLES, ToolRegistry, default_registry
+
+
+# Markdown that TTS would read out literally; stop generation if it starts
+SPEECH_STOP_SEQUENCES = ["```", "\n|"]
+
+_DEEP_PATTERN = re.compile(
+    r"\b(why|explain|compare|difference between|pros and cons|summari[sz]e|"
+    r"help me (?:understand|decide))\b"
+)
+# "how do", "write", "plan" etc. are also plain commands ("how do I turn on
+# the lights", "write it down"); only deep with an explanatory object
+_DEEP_TASK_PATTERN = re.compile(
+    r"\bhow (?:does|do|did|would|could|can)\b.*\b(?:work|works|happen|happens|form|forms)\b|"
+    r"\b(?:write|tell) (?:me )?(?:a|an) (?:\w+ )?(?:story|poem|essay|letter|speech)\b|"
+    r"\bplan (?:a|an|my|our)\b|\b(?:recipe|steps) (?:for|to)\b"
+)
+_QUICK_PATTERN = re.compile(
+    r"^(?:hi|hello|hey|thanks|thank you|good (?:morning|afternoon|evening|night))\b|"
+    r"\b(?:what time|what day|what's the date|what is the date|yes or no)\b"
+)
+_YES_NO_PATTERN = re.compile(r"^(?:is|are|do|does|did|can|could|will|would|should|was|were)\b")
+_QUESTION_PATTERN = re.compile(
+    r"\?$|^(?:and|but|so|what|which|who|where|when|how|is|are|does|do|can|could|would|should)\b"
+)
+
+
+class Tier:
+    def __init__(self, name: str, model: str, max_tokens: int,
+                 length_hint: str = "", stop_sequences: list = None):
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+        self.length_hint = length_hint
+        self.stop_sequences = stop_sequences or []
+
+
+class RoutingDecision:
+    def __init__(self, tier: Tier, reason: str):
+        self.tier = tier
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return (f"tier={self.tier.name} model={self.tier.model} "
+                f"max_tokens={self.tier.max_tokens} reason={self.reason!r}")
+
+
+class ModelRouter:
+    """
+    Picks a model tier per turn.
+
+    Policies:
+      'fixed':    always MODEL with MAX_TOKENS (the original behaviour)
+      'adaptive': quick / standard / deep based on transcript length,
+                  question type and whether we're mid-way through a deep thread
+    """
+
+    def __init__(self, policy: str = None):
+        cfg = settings.agent
+        self.policy = policy or cfg.ROUTING_POLICY
+        self.tiers = {
+            "fixed": Tier("fixed", cfg.MODEL, cfg.MAX_TOKENS),
+            "quick": Tier(
+                "quick", cfg.MODEL_QUICK, cfg.MAX_TOKENS_QUICK,
+                "Answer in one short sentence.", SPEECH_STOP_SEQUENCES,
+            ),
+            "standard": Tier(
+                "standard", cfg.MODEL, cfg.MAX_TOKENS_STANDARD,
+                "Answer in two or three sentences.", SPEECH_STOP_SEQUENCES,
+            ),
+            "deep": Tier(
+                "deep", cfg.MODEL_DEEP, max(cfg.MAX_TOKENS_DEEP, cfg.MAX_TOKENS_STANDARD),
+                "Be thorough but keep it short enough to listen to comfortably.",
+                SPEECH_STOP_SEQUENCES,
+            ),
+        }
+        self._last_tier: str = None
+
+        # Per-tier end-to-end chat latency in seconds (most recent LATENCY_SAMPLES)
+        self.latencies: dict[str, collections.deque] = {}
+
+    def route(self, user_text: str) -> RoutingDecision:
+        decision = self._decide(user_text)
+        self._last_tier = decision.tier.name
+        print(f"[Router] {decision}")
+        return decision
+
+    def _decide(self, user_text: str) -> RoutingDecision:
+        if self.policy != "adaptive":
+            return RoutingDecision(self.tiers["fixed"], f"policy={self.policy}")
+
+        text = user_text.lower().strip()
+        words = len(text.split())
+
+        if _DEEP_PATTERN.search(text):
+            return RoutingDecision(self.tiers["deep"], "open-ended question")
+        if _DEEP_TASK_PATTERN.search(text):
+            return RoutingDecision(self.tiers["deep"], "explanation or writing task")
+        if words > 25:
+            return RoutingDecision(self.tiers["deep"], f"long request ({words} words)")
+        if _QUICK_PATTERN.search(text):
+            return RoutingDecision(self.tiers["quick"], "small talk / simple lookup")
+        if self._last_tier == "deep" and words <= 10 and _QUESTION_PATTERN.search(text):
+            return RoutingDecision(self.tiers["deep"], "follow-up question in deep thread")
+        if _YES_NO_PATTERN.match(text) and words <= 10:
+            return RoutingDecision(self.tiers["quick"], "yes/no question")
+        if words <= 4:
+            return RoutingDecision(self.tiers["quick"], f"short request ({words} words)")
+        return RoutingDecision(self.tiers["standard"], "default")
+
+    def record(self, decision: RoutingDecision, seconds: float) -> None:
+        """Record a turn's latency and log running medians per tier."""
+        self.latencies.setdefault(
+            decision.tier.name, collections.deque(maxlen=LATENCY_SAMPLES)
+        ).append(seconds)
+        medians = ", ".join(
+            f"{name} {statistics.median(v):.2f}s (n={len(v)})"
+            for name, v in self.latencies.items()
+        )
+        print(f"[Router] {decision.tier.name} turn took {seconds:.2f}s | medians: {medians}")
+
+    def reset(self) -> None:
+        self._last_tier = None
+
+
+def _valid_history(messages: list[dict]) -> list[dict]:
+    """Trim restored messages so they start with a user turn and end with an assistant one."""
+    start = 0
+    while start < len(messages) and messages[start]["role"] != "user":
+        start += 1
+    end = len(messages)
+    while end > start and messages[end - 1]["role"] != "assistant":
+        end -= 1
+    return messages[start:end]
+
+
+def _trim_to_sentence(text: str) -> str:
+    """Drop a trailing partial sentence left by a token cap or stop sequence."""
+    end = max(text.rfind(". "), text.rfind("? "), text.rfind("! "))
+    if text.endswith((".", "?", "!")) or end < 0:
+        return text
+    return text[: end + 1]
 
 
 class ClaudeAgent:
-    def __init__(self):
+    def __init__(self, tools: ToolRegistry = None, router: ModelRouter = None,
+                 store: ConversationStore = None, persist: bool = None):
+        """
+        Args:
+            tools: Tool registry (default: built-in tools if TOOLS_ENABLED)
+            router: Model router (default: ROUTING_POLICY)
+            store: Conversation store to restore from and append to
+            persist: Build the default store when none is given
+                (default HISTORY_PERSIST); False keeps history in memory only
+        """
         cfg = settings.agent
         self.client = anthropic.Anthropic(api_key=cfg.ANTHROPIC_API_KEY)
-        self.model = cfg.MODEL
-        self.max_tokens = cfg.MAX_TOKENS
+        self.router = router or ModelRouter()
         self.system_prompt = cfg.SYSTEM_PROMPT
         self.max_history_turns = cfg.MAX_HISTORY_TURNS
+        self.max_tool_rounds = cfg.MAX_TOOL_ROUNDS
+
+        if tools is None and cfg.TOOLS_ENABLED:
+            tools = default_registry()
+        self.tools = tools
 
         # Conversation history: list of {"role": ..., "content": ...}
         self._history: list[dict] = []
 
+        if persist is None:
+            persist = cfg.HISTORY_PERSIST
+        try:
+            if store is None and persist:
+                store = ConversationStore(
+                    cfg.HISTORY_DIR,
+                    session=cfg.HISTORY_SESSION,
+                    keep_messages=self.max_history_turns * 2,
+                    flush_interval=cfg.HISTORY_FLUSH_INTERVAL,
+                    snapshot_every=cfg.HISTORY_SNAPSHOT_EVERY,
+                )
+            if store is not None:
+                self._history = _valid_history(store.restore())
+        except OSError as e:
+            # A broken disk shouldn't stop the assistant from starting
+            print(f"[Agent] History persistence disabled: {e}")
+            store = None
+            self._history = []
+        self.store = store
+
     def chat(self, user_text: str) -> str:
         """
         Send a user message to Claude, get a response, and update history.
@@ -48,30 +245,96 @@ class ClaudeAgent:
             # Always keep from index 0 as a user turn (API requirement)
             self._history = self._history[-max_messages:]
 
-        print(f"[Agent] Sending to Claude ({self.model}), "
+        turn_start = time.monotonic()
+        decision = self.router.route(user_text)
+        print(f"[Agent] Sending to Claude ({decision.tier.model}), "
               f"history={len(self._history)} messages...")
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            system=self.system_prompt,
-            messages=self._history,
-        )
+        # Tool exchanges live only in this per-turn copy of the history
+        messages = list(self._history)
+        message = self._create(messages, decision.tier)
+
+        rounds = 0
+        while message.stop_reason == "tool_use" and rounds < self.max_tool_rounds:
+            rounds += 1
+            tool_uses = [b for b in message.content if b.type == "tool_use"]
+            print(f"[Agent] Tool round {rounds}: "
+                  f"{', '.join(b.name for b in tool_uses)}")
+            messages.append({"role": "assistant", "content": message.content})
+            messages.append({"role": "user", "content": self.tools.run(tool_uses)})
+            message = self._create(messages, decision.tier)
 
         # Extract text from the response
-        response_text = message.content[0].text
+        response_text = "".join(
+            b.text for b in message.content if b.type == "text"
+        ).strip()
+        if message.stop_reason in ("max_tokens", "stop_sequence"):
+            response_text = _trim_to_sentence(response_text)
+        if message.stop_reason == "tool_use":
+            # MAX_TOOL_ROUNDS hit while Claude still wanted tools; any text is
+            # only a preamble ("Let me check."), not an answer
+            print(f"[Agent] Gave up after {rounds} tool round(s).")
+            response_text = ""
+        if not response_text:
+            response_text = "Sorry, I couldn't finish that."
         print(f"[Agent] Response: {response_text[:80]}{'...' if len(response_text) > 80 else ''}")
 
         # Add Claude's response to history so next turn has context
         self._history.append({"role": "assistant", "content": response_text})
+        if self.store is not None:
+            # Persist the pair together so a crash mid-call can't leave a lone user turn
+            self.store.append(*self._history[-2:])
 
+        self.router.record(decision, time.monotonic() - turn_start)
         return response_text
 
+    def _create(self, messages: list[dict], tier: Tier):
+        """Stream one Messages API request and return the final message."""
+        kwargs = {}
+        if self.tools:
+            kwargs["tools"] = self.tools.definitions()
+        if tier.stop_sequences:
+            kwargs["stop_sequences"] = tier.stop_sequences
+
+        system = self.system_prompt
+        if tier.length_hint:
+            system = f"{system} {tier.length_hint}"
+
+        start = time.monotonic()
+        first_token = None
+        with self.client.messages.stream(
+            model=tier.model,
+            max_tokens=tier.max_tokens,
+            system=system,
+            messages=messages,
+            **kwargs,
+        ) as stream:
+            for _ in stream.text_stream:
+                if first_token is None:
+                    first_token = time.monotonic() - start
+            message = stream.get_final_message()
+
+        total = time.monotonic() - start
+        ttft = f"{first_token * 1000:.0f}ms" if first_token is not None else "n/a"
+        print(f"[Agent] Claude call: first token {ttft}, total {total * 1000:.0f}ms, "
+              f"stop_reason={message.stop_reason}")
+        return message
+
     def reset_history(self) -> None:
         """Clear conversation history to start a fresh session."""
         self._history = []
+        self.router.reset()
+        if self.store is not None:
+            self.store.reset()
         print("[Agent] Conversation history cleared.")
 
+    def close(self) -> None:
+        """Flush persisted history and stop background workers."""
+        if self.store is not None:
+            self.store.close()
+        if self.tools:
+            self.tools.shutdown()
+
     @property
     def turn_count(self) -> int:
         """Returns the number of complete user/assistant turn pairs."""
@@ -0,0 +1,262 @@
+"""
+Crash-safe on-disk conversation store.
+
+Layout (one directory per session):
+  <HISTORY_DIR>/<session>/turns.<n>.log  append-only JSON lines, one message each
+  <HISTORY_DIR>/<session>/snapshot.json  last N messages + the segment to replay
+
+Writes go through a bounded queue to a background writer thread, so the
+voice loop never waits on disk. The writer batches whatever is queued, and
+fsyncs at most once per HISTORY_FLUSH_INTERVAL seconds.
+
+Every HISTORY_SNAPSHOT_EVERY records the writer compacts: it creates the
+next log segment, atomically replaces snapshot.json (write tmp, fsync,
+rename) with the in-memory tail of the conversation pointing at that new
+segment, then deletes the old segment. restore() reads the snapshot and
+replays only the current segment, so startup cost depends on N and the
+snapshot interval, and disk use stays bounded however long the device runs.
+
+A torn final line (crash mid-write) is dropped and truncated on restore.
+Disk errors (full or read-only SD card) are logged and the affected batch
+is dropped; the writer keeps running and retries with the next batch.
+"""
+import collections
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+LOG_PATTERN = "turns.{:06d}.log"
+SNAPSHOT_NAME = "snapshot.json"
+
+# Default max messages waiting for the writer; beyond this, appends are dropped
+QUEUE_LIMIT = 1000
+
+# Queue sentinel asking the writer thread to flush and exit
+_STOP = object()
+
+
+class ConversationStore:
+    def __init__(self, directory: str, session: str = "default",
+                 keep_messages: int = 20, flush_interval: float = 1.0,
+                 snapshot_every: int = 50, queue_limit: int = QUEUE_LIMIT):
+        self.path = Path(directory) / session
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.path / SNAPSHOT_NAME
+        self.keep_messages = keep_messages
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+
+        self._segment = 0
+        self.log_path = self.path / LOG_PATTERN.format(self._segment)
+
+        self._queue = queue.Queue(maxsize=queue_limit)
+        self._dropping = False
+        self._tail = collections.deque(maxlen=keep_messages)
+        self._since_snapshot = 0
+        self._log = None
+        self._log_end = 0
+        self._thread = None
+
+        # Writer counters, for logging and benchmarks
+        self.stats = {"records": 0, "batches": 0, "fsyncs": 0, "snapshots": 0,
+                      "errors": 0, "dropped": 0}
+
+    def restore(self) -> list[dict]:
+        """
+        Load the last keep_messages messages and start the writer thread.
+
+        Returns:
+            Messages as {"role": ..., "content": ...} dicts, oldest first.
+
+        Raises:
+            OSError: The session directory can't be read or written.
+        """
+        start = time.monotonic()
+        if self.snapshot_path.exists():
+            try:
+                with open(self.snapshot_path, "r") as f:
+                    snapshot = json.load(f)
+                self._tail.extend(snapshot["messages"])
+                self._segment = snapshot["segment"]
+            except (ValueError, KeyError) as e:
+                print(f"[History] Ignoring unreadable snapshot ({e})")
+                self._tail.clear()
+        self.log_path = self.path / LOG_PATTERN.format(self._segment)
+        self._remove_stale_segments()
+
+        replayed = 0
+        valid_end = 0
+        if self.log_path.exists():
+            size = self.log_path.stat().st_size
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self._apply(record)
+                    valid_end += len(line)
+                    replayed += 1
+            if valid_end < size:
+                print(f"[History] Dropping {size - valid_end} bytes of torn log tail")
+                os.truncate(self.log_path, valid_end)
+
+        self._since_snapshot = replayed
+        self._log = open(self.log_path, "ab", buffering=0)
+        self._log_end = valid_end
+        self._thread = threading.Thread(
+            target=self._writer, name="history-writer", daemon=True
+        )
+        self._thread.start()
+
+        print(f"[History] Restored {len(self._tail)} messages "
+              f"({replayed} replayed from log) in "
+              f"{(time.monotonic() - start) * 1000:.1f}ms")
+        return list(self._tail)
+
+    def append(self, *messages: dict) -> None:
+        """Queue messages for writing. Never blocks on disk."""
+        for message in messages:
+            self._put({"role": message["role"], "content": message["content"]})
+
+    def reset(self) -> None:
+        """Record a history reset; restore() will not return anything before it."""
+        self._put({"reset": True})
+
+    def close(self) -> None:
+        """Flush everything queued, fsync, and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._log.close()
+
+    def _put(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+            self._dropping = False
+        except queue.Full:
+            # The writer is stuck (e.g. disk errors); don't grow without bound
+            self.stats["dropped"] += 1
+            if not self._dropping:
+                print("[History] Write queue full, dropping messages.")
+                self._dropping = True
+
+    def _apply(self, record: dict) -> None:
+        if record.get("reset"):
+            self._tail.clear()
+        else:
+            self._tail.append(record)
+
+    def _writer(self) -> None:
+        last_fsync = time.monotonic()
+        dirty = False
+        while True:
+            timeout = None
+            if dirty:
+                timeout = max(0.0, last_fsync + self.flush_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            # Drain whatever else is already queued into the same batch
+            batch = [] if item is None else [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(r is _STOP for r in batch)
+            records = [r for r in batch if r is not _STOP]
+            try:
+                if records:
+                    self._write(records)
+                    dirty = True
+
+                if dirty and (stop or time.monotonic() - last_fsync >= self.flush_interval):
+                    dirty = False
+                    last_fsync = time.monotonic()
+                    os.fsync(self._log.fileno())
+                    self.stats["fsyncs"] += 1
+                    if self._since_snapshot >= self.snapshot_every:
+                        self._compact()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[History] Write failed ({len(records)} record(s) in batch): {e}")
+
+            if stop:
+                return
+
+    def _write(self, records: list) -> None:
+        """Append records to the current segment; on failure, cut back to the last good end."""
+        data = b"".join(
+            json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n"
+            for r in records
+        )
+        try:
+            view = memoryview(data)
+            while view:
+                written = self._log.write(view)
+                view = view[written:]
+        except OSError:
+            # Don't leave a partial line in front of later records
+            try:
+                os.truncate(self.log_path, self._log_end)
+            except OSError:
+                pass
+            raise
+
+        self._log_end += len(data)
+        for record in records:
+            self._apply(record)
+        self._since_snapshot += len(records)
+        self.stats["records"] += len(records)
+        self.stats["batches"] += 1
+
+    def _compact(self) -> None:
+        """Snapshot the tail into a fresh segment and delete the old one (log must be fsynced)."""
+        next_segment = self._segment + 1
+        next_path = self.path / LOG_PATTERN.format(next_segment)
+        next_log = open(next_path, "ab", buffering=0)
+
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        snapshot = {"segment": next_segment, "messages": list(self._tail)}
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            next_log.close()
+            raise
+
+        old_path = self.log_path
+        self._log.close()
+        self._log = next_log
+        self._log_end = 0
+        self._segment = next_segment
+        self.log_path = next_path
+        self._since_snapshot = 0
+        self.stats["snapshots"] += 1
+        try:
+            old_path.unlink()
+        except OSError as e:
+            print(f"[History] Could not remove old log segment: {e}")
+
+    def _remove_stale_segments(self) -> None:
+        """Delete segments left behind by a crash during compaction."""
+        for path in self.path.glob("turns.*.log"):
+            if path != self.log_path:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
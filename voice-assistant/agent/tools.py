@@ -0,0 +1,265 @@
+"""
+Tool registry for Claude tool use.
+
+Tools are plain Python callables registered with a JSON schema. When Claude
+responds with one or more tool_use blocks, ToolRegistry.run() executes them
+concurrently in a thread pool and returns the matching tool_result blocks:
+
+  [
+    {"type": "tool_result", "tool_use_id": "...", "content": "..."},
+    ...
+  ]
+
+Each tool has its own timeout, counted from when its call actually starts
+running (not from when it was queued). A tool that misses it is reported
+back to Claude as an error so one slow tool can't hold up the spoken reply;
+its thread finishes in the background and the result is discarded.
+
+Abandoned calls still occupy a pool worker. While a tool has an abandoned
+call running, or abandoned calls fill every worker, new calls fail fast
+instead of queueing behind them (e.g. an unreachable sensor).
+
+Tools registered with cache_ttl > 0 are treated as idempotent: results are
+memoized per (name, input) for that many seconds.
+"""
+import collections
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+
+from config.settings import settings
+
+# Recent calls kept per tool for latency logging
+LATENCY_SAMPLES = 100
+
+
+class Tool:
+    def __init__(self, name: str, description: str, input_schema: dict,
+                 func, timeout: float, cache_ttl: float):
+        self.name = name
+        self.description = description
+        self.input_schema = input_schema
+        self.func = func
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+
+    def definition(self) -> dict:
+        """Tool definition in the format expected by the Messages API."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema,
+        }
+
+
+class ToolRegistry:
+    def __init__(self, max_workers: int = None, default_timeout: float = None):
+        cfg = settings.agent
+        self.default_timeout = default_timeout or cfg.TOOL_TIMEOUT_SECONDS
+        self.max_workers = max_workers or cfg.TOOL_MAX_WORKERS
+        self._tools: dict[str, Tool] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="tool",
+        )
+
+        # Timed-out calls still running in the pool, per tool name
+        self._abandoned: dict[str, int] = {}
+        self._abandoned_lock = threading.Lock()
+
+        # (name, canonical input JSON) -> (expires_at, result)
+        self._cache: dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
+
+        # Per-tool latencies in seconds (most recent LATENCY_SAMPLES), for logging
+        self.latencies: dict[str, collections.deque] = {}
+
+    def register(self, name: str, description: str, input_schema: dict, func,
+                 timeout: float = None, cache_ttl: float = 0.0) -> None:
+        """
+        Register a tool.
+
+        Args:
+            name: Tool name Claude will call
+            description: What the tool does (shown to Claude)
+            input_schema: JSON schema for the tool input
+            func: Callable taking the input fields as keyword arguments and
+                returning a str (or anything json-serializable)
+            timeout: Seconds before the call is abandoned (default TOOL_TIMEOUT_SECONDS)
+            cache_ttl: Seconds to memoize results; 0 for non-idempotent tools
+        """
+        self._tools[name] = Tool(
+            name, description, input_schema, func,
+            timeout or self.default_timeout, cache_ttl,
+        )
+
+    def tool(self, description: str, input_schema: dict = None, **kwargs):
+        """Decorator form of register(); the function name is the tool name."""
+        def decorator(func):
+            self.register(
+                func.__name__, description,
+                input_schema or {"type": "object", "properties": {}},
+                func, **kwargs,
+            )
+            return func
+        return decorator
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def definitions(self) -> list[dict]:
+        return [t.definition() for t in self._tools.values()]
+
+    def run(self, tool_uses: list) -> list[dict]:
+        """
+        Execute tool_use blocks concurrently.
+
+        Args:
+            tool_uses: tool_use content blocks from a Claude response
+
+        Returns:
+            tool_result blocks, in the same order as tool_uses
+        """
+        start = time.monotonic()
+        pending = []
+        for block in tool_uses:
+            tool = self._tools.get(block.name)
+            cached = self._cache_get(tool, block.input)
+            busy = None
+            if tool is not None and cached is None:
+                busy = self._busy_reason(tool)
+            if tool is None or cached is not None or busy:
+                pending.append((block, tool, None, cached, busy))
+            else:
+                call = {"started": threading.Event(), "start": None}
+                future = self._executor.submit(self._call, tool, block.input, call)
+                pending.append((block, tool, (future, call), None, None))
+
+        results = []
+        for block, tool, submitted, cached, busy in pending:
+            if tool is None:
+                results.append(_result(block.id, f"Unknown tool: {block.name}", True))
+                continue
+            if busy:
+                print(f"[Tools] {tool.name}: skipped ({busy})")
+                results.append(_result(
+                    block.id, f"{tool.name} is unavailable right now", True
+                ))
+                continue
+            if cached is not None:
+                print(f"[Tools] {tool.name}: cache hit")
+                results.append(_result(block.id, cached))
+                continue
+
+            future, call = submitted
+            try:
+                output, elapsed = self._wait(tool, future, call, start)
+            except FutureTimeout:
+                print(f"[Tools] {tool.name}: timed out after {tool.timeout:.1f}s")
+                self._record_latency(tool, tool.timeout)
+                self._abandon(tool, future)
+                results.append(_result(block.id, f"{tool.name} timed out", True))
+                continue
+            except Exception as e:
+                print(f"[Tools] {tool.name}: error: {e}")
+                results.append(_result(block.id, f"{tool.name} failed: {e}", True))
+                continue
+
+            print(f"[Tools] {tool.name}: {elapsed * 1000:.0f}ms")
+            self._record_latency(tool, elapsed)
+            self._cache_put(tool, block.input, output)
+            results.append(_result(block.id, output))
+
+        print(f"[Tools] Ran {len(tool_uses)} tool call(s) in "
+              f"{(time.monotonic() - start) * 1000:.0f}ms")
+        return results
+
+    def _record_latency(self, tool: Tool, seconds: float) -> None:
+        self.latencies.setdefault(
+            tool.name, collections.deque(maxlen=LATENCY_SAMPLES)
+        ).append(seconds)
+
+    @staticmethod
+    def _wait(tool: Tool, future, call: dict, submitted_at: float):
+        """Wait for a call, giving it tool.timeout from when it starts running."""
+        # Allow up to one timeout of queueing behind other calls in this batch
+        queue_wait = max(0.0, submitted_at + tool.timeout - time.monotonic())
+        if not call["started"].wait(timeout=queue_wait) and future.cancel():
+            raise FutureTimeout()
+        call["started"].wait()
+        remaining = max(0.0, call["start"] + tool.timeout - time.monotonic())
+        return future.result(timeout=remaining)
+
+    def _busy_reason(self, tool: Tool):
+        """Why a new call to tool should fail fast, or None."""
+        with self._abandoned_lock:
+            if self._abandoned.get(tool.name):
+                return "stuck"
+            if sum(self._abandoned.values()) >= self.max_workers:
+                return "busy"
+        return None
+
+    def _abandon(self, tool: Tool, future) -> None:
+        """Count a timed-out call until its thread finally returns."""
+        with self._abandoned_lock:
+            self._abandoned[tool.name] = self._abandoned.get(tool.name, 0) + 1
+
+        def release(_):
+            with self._abandoned_lock:
+                self._abandoned[tool.name] -= 1
+
+        future.add_done_callback(release)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _call(tool: Tool, tool_input: dict, call: dict):
+        start = time.monotonic()
+        call["start"] = start
+        call["started"].set()
+        output = tool.func(**(tool_input or {}))
+        if not isinstance(output, str):
+            output = json.dumps(output)
+        return output, time.monotonic() - start
+
+    def _cache_get(self, tool: Tool, tool_input: dict):
+        if tool is None or tool.cache_ttl <= 0:
+            return None
+        key = (tool.name, json.dumps(tool_input, sort_keys=True))
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, output = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[key]
+                return None
+            return output
+
+    def _cache_put(self, tool: Tool, tool_input: dict, output: str) -> None:
+        if tool.cache_ttl <= 0:
+            return
+        key = (tool.name, json.dumps(tool_input, sort_keys=True))
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + tool.cache_ttl, output)
+
+
+def _result(tool_use_id: str, content: str, is_error: bool = False) -> dict:
+    result = {"type": "tool_result", "tool_use_id": tool_use_id, "content": content}
+    if is_error:
+        result["is_error"] = True
+    return result
+
+
+def default_registry() -> ToolRegistry:
+    """Registry with the built-in local tools."""
+    registry = ToolRegistry()
+
+    @registry.tool("Get the current local date and time on the device.")
+    def get_current_time() -> str:
+        return datetime.now().strftime("%A, %B %d, %Y %I:%M %p")
+
+    return registry
@@ -0,0 +1,134 @@
+"""
+Bounded capture buffer for utterance recording.
+
+The buffer has a hard byte cap (derived from MAX_UTTERANCE_SECONDS) so a VAD
+that never sees silence (TV on, fan noise) cannot grow memory until the
+process is killed.
+
+Layout:
+  - A fixed, preallocated bytearray holds the first CAPTURE_MEMORY_SECONDS
+    of audio. It is allocated once and reused for every utterance.
+  - If an utterance outgrows that region, the data is moved once into an
+    anonymous (already unlinked) temp file sized to the hard cap and
+    memory-mapped. Further frames are written straight into the mapping.
+
+Either way the audio is contiguous, so view() hands downstream code a
+memoryview without joining frames or copying.
+
+A view returned by view() is only valid until the next reset().
+"""
+import mmap
+import resource
+import tempfile
+
+
+class CaptureBuffer:
+    def __init__(self, memory_bytes: int, max_bytes: int, spill_dir: str = None):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.memory_bytes = min(memory_bytes, max_bytes)
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+
+        # Preallocated once; never resized so outstanding views stay valid
+        self._memory = bytearray(self.memory_bytes)
+        self._mmap = None
+        self._length = 0
+
+        # Number of full-buffer copies made this utterance (spill moves data once)
+        self.copies = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def spilled(self) -> bool:
+        return self._mmap is not None
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_bytes
+
+    def append(self, frame: bytes) -> bool:
+        """
+        Append a frame of PCM audio.
+
+        Returns:
+            True if the whole frame was stored, False if the hard cap was hit
+            (the frame is truncated to whatever space remained).
+        """
+        n = len(frame)
+        end = self._length + n
+        stored = True
+        if end > self.max_bytes:
+            frame = memoryview(frame)[: self.max_bytes - self._length]
+            n = len(frame)
+            end = self.max_bytes
+            stored = False
+
+        if end > self.memory_bytes and self._mmap is None:
+            self._spill()
+
+        target = self._mmap if self._mmap is not None else self._memory
+        target[self._length:end] = frame
+        self._length = end
+        return stored
+
+    def extend(self, frames) -> bool:
+        """Append several frames. Returns False if the hard cap was hit."""
+        for frame in frames:
+            if not self.append(frame):
+                return False
+        return True
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the captured audio."""
+        target = self._mmap if self._mmap is not None else self._memory
+        return memoryview(target)[: self._length]
+
+    def reset(self) -> None:
+        """Forget captured audio and drop any spill mapping."""
+        self._length = 0
+        self.copies = 0
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a view; the mapping is released
+                # when that view is garbage collected.
+                pass
+            self._mmap = None
+
+    def _spill(self) -> None:
+        """Move the in-memory region into a memory-mapped temp file."""
+        print(f"[Capture] Utterance exceeds {self.memory_bytes} bytes, "
+              f"spilling to disk (cap {self.max_bytes} bytes)...")
+        # TemporaryFile is unlinked on creation, so nothing is left on disk
+        # after the mapping is closed, even on a crash.
+        with tempfile.TemporaryFile(dir=self.spill_dir) as f:
+            f.truncate(self.max_bytes)
+            self._mmap = mmap.mmap(f.fileno(), self.max_bytes)
+        self._mmap[: self._length] = memoryview(self._memory)[: self._length]
+        self.copies += 1
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's peak-RSS counter so the next reading is per-turn (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size in KB since the last reset_peak_rss()."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # Fallback: lifetime peak (KB on Linux)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
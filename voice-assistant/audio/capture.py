@@ -8,7 +8,15 @@ Flow:
   4. State machine transitions:
        WAITING  -> RECORDING when speech detected
        RECORDING -> DONE when N consecutive silent frames seen
-  5. Return raw PCM bytes of the entire utterance
+  5. Return a zero-copy view of the utterance's raw PCM
+
+The input stream is opened once and only stopped/started between
+utterances, so a follow-up turn (record_utterance with a timeout) starts
+listening on the already-open stream instead of reopening the device.
+
+Frames are written into a bounded CaptureBuffer (see audio/buffer.py):
+recording stops at MAX_UTTERANCE_SECONDS even if silence never comes, and
+anything beyond CAPTURE_MEMORY_SECONDS spills to a memory-mapped temp file.
 
 webrtcvad constraints:
   - Only supports 8000, 16000, 32000, 48000 Hz
@@ -18,7 +26,15 @@ webrtcvad constraints:
 import pyaudio
 import webrtcvad
 import collections
+import time
+from typing import Optional
 from config.settings import settings
+from audio.buffer import CaptureBuffer, peak_rss_kb, reset_peak_rss
+
+# With a timeout (follow-up mode) there is no trigger press vouching for the
+# turn, so speech must fill this share of the pre-speech ring buffer before
+# recording starts; a single voiced frame of TV or fan noise is not enough.
+TIMED_ONSET_RATIO = 0.8
 
 
 class AudioCapture:
@@ -38,8 +54,30 @@ class AudioCapture:
         self.silence_threshold = cfg.SILENCE_FRAMES_THRESHOLD
         self.vad_aggressiveness = cfg.VAD_AGGRESSIVENESS
 
+        bytes_per_second = self.sample_rate * self.sample_width * self.channels
+        self._buffer = CaptureBuffer(
+            memory_bytes=int(cfg.CAPTURE_MEMORY_SECONDS * bytes_per_second),
+            max_bytes=int(cfg.MAX_UTTERANCE_SECONDS * bytes_per_second),
+            spill_dir=cfg.CAPTURE_SPILL_DIR,
+        )
+        # Per-turn instrumentation from the last record_utterance() call;
+        # downstream copies (SpeechToText.transcribe) add to "copies"
+        self.last_stats: dict = {}
+
         self._pa = pyaudio.PyAudio()
         self._vad = webrtcvad.Vad(self.vad_aggressiveness)
+        self._stream = None
+        self.listening_since: float = None
+
+    def _start_stream(self):
+        """Open the input stream on first use, otherwise restart the stopped one."""
+        if self._stream is None:
+            self._stream = self._open_stream()
+        elif self._stream.is_stopped():
+            # Restarting drops whatever was buffered while we weren't listening
+            # (e.g. our own playback), and is much cheaper than a reopen.
+            self._stream.start_stream()
+        return self._stream
 
     def _open_stream(self):
         return self._pa.open(
@@ -51,22 +89,48 @@ class AudioCapture:
             frames_per_buffer=self.frame_bytes // self.sample_width,
         )
 
-    def record_utterance(self, pre_speech_frames: int = 10) -> bytes:
+    def record_utterance(
+        self, pre_speech_frames: int = 10, timeout: float = None
+    ) -> Optional[memoryview]:
         """
         Block until a complete utterance is captured.
 
         Records audio starting slightly before speech is detected
         (using a ring buffer of pre_speech_frames) and stops after
-        SILENCE_FRAMES_THRESHOLD consecutive silent frames.
+        SILENCE_FRAMES_THRESHOLD consecutive silent frames, or when
+        MAX_UTTERANCE_SECONDS of audio has been recorded.
+
+        Without a timeout one voiced frame starts recording (the user just
+        pressed the trigger); with one, TIMED_ONSET_RATIO of the ring buffer
+        must be voiced.
+
+        Args:
+            pre_speech_frames: Frames kept from before speech onset
+            timeout: Seconds to wait for sustained speech to start; None waits
+                forever
 
         Returns:
-            Raw 16-bit mono PCM bytes at SAMPLE_RATE Hz.
+            Zero-copy view of raw 16-bit mono PCM at SAMPLE_RATE Hz, or None
+            if timeout elapsed without speech. The view is only valid until
+            the next call to record_utterance.
         """
-        stream = self._open_stream()
+        reset_peak_rss()
+        self._buffer.reset()
+        buffer = self._buffer
+
+        ready_start = time.monotonic()
+        stream = self._start_stream()
+        # Monotonic time the device started listening for this utterance
+        self.listening_since = time.monotonic()
+        stream_ready_ms = (self.listening_since - ready_start) * 1000
+        # (frame, is_speech) pairs from just before speech onset
         ring_buffer = collections.deque(maxlen=pre_speech_frames)
+        onset_frames = max(1, round(TIMED_ONSET_RATIO * pre_speech_frames))
         triggered = False
-        voiced_frames = []
         silent_frame_count = 0
+        frame_count = 0
+        capped = False
+        start = time.monotonic()
 
         print("[Capture] Listening for speech...")
         try:
@@ -79,30 +143,67 @@ class AudioCapture:
                 is_speech = self._vad.is_speech(frame, self.sample_rate)
 
                 if not triggered:
-                    ring_buffer.append(frame)
-                    if is_speech:
+                    ring_buffer.append((frame, is_speech))
+                    if timeout is None:
+                        onset = is_speech
+                    else:
+                        voiced = sum(1 for _, speech in ring_buffer if speech)
+                        onset = voiced >= onset_frames
+                    if not onset and timeout is not None \
+                            and time.monotonic() - start >= timeout:
+                        print(f"[Capture] No speech within {timeout:.1f}s.")
+                        break
+                    if onset:
                         triggered = True
                         print("[Capture] Speech detected, recording...")
                         # Include the pre-speech buffer so we don't clip the start
-                        voiced_frames.extend(list(ring_buffer))
+                        frame_count += len(ring_buffer)
+                        capped = not buffer.extend(f for f, _ in ring_buffer)
                         ring_buffer.clear()
                 else:
-                    voiced_frames.append(frame)
+                    frame_count += 1
+                    capped = not buffer.append(frame)
                     if not is_speech:
                         silent_frame_count += 1
                         if silent_frame_count >= self.silence_threshold:
                             print(
                                 f"[Capture] Silence detected after "
-                                f"{len(voiced_frames)} frames. Done."
+                                f"{frame_count} frames. Done."
                             )
                             break
                     else:
                         silent_frame_count = 0
-        finally:
-            stream.stop_stream()
-            stream.close()
 
-        return b"".join(voiced_frames)
+                if capped or buffer.full:
+                    print(
+                        f"[Capture] Reached max utterance length "
+                        f"({len(buffer)} bytes). Done."
+                    )
+                    break
+        except BaseException:
+            # A failed read can leave the device unusable; reopen next time
+            try:
+                self.close()
+            except Exception as e:
+                print(f"[Capture] Error closing stream: {e}")
+            raise
+        stream.stop_stream()
+
+        self.last_stats = {
+            "bytes": len(buffer),
+            "frames": frame_count,
+            "seconds": round(time.monotonic() - start, 2),
+            "stream_ready_ms": round(stream_ready_ms, 1),
+            "spilled": buffer.spilled,
+            "capped": buffer.full,
+            "copies": buffer.copies,
+            "peak_rss_kb": peak_rss_kb(),
+        }
+        print(f"[Capture] Stats: {self.last_stats}")
+
+        if not triggered:
+            return None
+        return buffer.view()
 
     def list_devices(self):
         """Utility: print all audio devices for finding the correct index."""
@@ -114,6 +215,15 @@ class AudioCapture:
             if info.get("maxOutputChannels", 0) > 0:
                 print(f"  Output device {i}: {info['name']}")
 
+    def close(self) -> None:
+        """Close the input stream (it is reopened on the next recording)."""
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+
     def __del__(self):
+        if getattr(self, "_stream", None) is not None:
+            self.close()
         if self._pa:
             self._pa.terminate()
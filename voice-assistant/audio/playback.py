@@ -5,56 +5,137 @@ Google TTS returns MP3 bytes. We use pydub to decode MP3 in-memory,
 then play via PyAudio to the correct output device.
 
 pydub requires ffmpeg to be installed for MP3 decoding.
+
+Perceived latency:
+  Between the end of speech and the first TTS sample the device would
+  otherwise be silent for the whole STT + Claude + TTS time. Calling
+  acknowledge() as soon as capture ends:
+    1. plays a short, pre-decoded PCM earcon immediately
+    2. if no response has arrived after FILLER_DEADLINE_MS, plays cached
+       filler phrases ("One moment.") every FILLER_INTERVAL_MS
+    3. cross-fades out of the earcon/filler into the response as soon as
+       play_mp3_bytes() hands it over
+  All of this runs on a background thread, so the pipeline never waits on
+  it. Each turn logs time-to-first-sound vs. time-to-response-audio.
 """
+import collections
 import io
+import statistics
+import threading
+import time
 import pyaudio
 import wave
 from pydub import AudioSegment
+from pydub.generators import Sine
 from config.settings import settings
 
+# TTS native rate; earcon, fillers and responses are all normalized to it
+PLAYBACK_SAMPLE_RATE = 22050
+CHUNK_BYTES = 1024
+# Recent turns kept for the running time-to-first-sound medians
+LATENCY_SAMPLES = 100
+
 
 class AudioPlayer:
     def __init__(self):
-        self.output_device_index = settings.audio.OUTPUT_DEVICE_INDEX
+        cfg = settings.audio
+        self.output_device_index = cfg.OUTPUT_DEVICE_INDEX
+        self.filler_deadline = cfg.FILLER_DEADLINE_MS / 1000
+        self.filler_interval = cfg.FILLER_INTERVAL_MS / 1000
+        self.crossfade_ms = cfg.CROSSFADE_MS
         self._pa = pyaudio.PyAudio()
 
-    def play_mp3_bytes(self, mp3_bytes: bytes) -> None:
+        # Pre-decoded PCM, ready to write without touching ffmpeg
+        self._earcon = self._load_earcon(cfg.EARCON_PATH) if cfg.EARCON_ENABLED else b""
+        self._fillers: list[bytes] = []
+
+        # Acknowledgement state for the turn in flight
+        self._ack_started: float = None
+        self._ack_thread: threading.Thread = None
+        self._ack_lock = threading.Lock()
+        self._ack_wakeup = threading.Event()
+        self._ack_cancel = threading.Event()
+        self._ack_done = threading.Event()
+        self._pending_response: bytes = None
+        self._first_sound_at: float = None
+        self._response_sound_at: float = None
+
+        # Seconds from acknowledge() to first sound / first response sample
+        self.ttfs = {
+            "perceived": collections.deque(maxlen=LATENCY_SAMPLES),
+            "response": collections.deque(maxlen=LATENCY_SAMPLES),
+        }
+
+    def load_fillers(self, mp3_clips: list) -> None:
+        """Decode filler phrase MP3s (e.g. from TTS at startup) and cache the PCM."""
+        self._fillers = [self._decode_mp3(clip) for clip in mp3_clips if clip]
+        print(f"[Playback] Cached {len(self._fillers)} filler phrase(s).")
+
+    def acknowledge(self) -> None:
         """
-        Decode MP3 bytes and play through the ReSpeaker speaker output.
-        Blocks until playback is complete.
+        Start the perceived-latency layer for a new turn. Returns immediately.
+
+        Call when capture ends; the next play_mp3_bytes() cross-fades into
+        the response, and cancel_acknowledgement() stops it without one.
         """
-        # Decode MP3 -> raw PCM using pydub (requires ffmpeg)
-        audio_segment = AudioSegment.from_mp3(io.BytesIO(mp3_bytes))
+        self.cancel_acknowledgement()
+        self._ack_started = time.monotonic()
+        self._first_sound_at = None
+        self._response_sound_at = None
+        if not self._earcon and not self._fillers:
+            return
+
+        self._pending_response = None
+        self._ack_wakeup.clear()
+        self._ack_cancel.clear()
+        self._ack_done.clear()
+        self._ack_thread = threading.Thread(
+            target=self._ack_worker, name="ack-playback", daemon=True
+        )
+        self._ack_thread.start()
 
-        # Normalize to mono 16-bit PCM at the system sample rate
-        audio_segment = audio_segment.set_channels(1)
-        audio_segment = audio_segment.set_sample_width(2)  # 16-bit
-        audio_segment = audio_segment.set_frame_rate(22050)  # TTS native rate
+    def cancel_acknowledgement(self) -> None:
+        """Stop any earcon/filler in progress (e.g. the turn was abandoned)."""
+        if self._ack_thread is not None:
+            self._ack_cancel.set()
+            self._ack_wakeup.set()
+            self._ack_thread.join()
+            self._ack_thread = None
+        self._ack_started = None
 
-        raw_pcm = audio_segment.raw_data
-        sample_rate = audio_segment.frame_rate
-        channels = audio_segment.channels
-        sample_width = audio_segment.sample_width
+    def play_mp3_bytes(self, mp3_bytes: bytes) -> None:
+        """
+        Decode MP3 bytes and play through the ReSpeaker speaker output.
+        Blocks until playback is complete.
 
-        stream = self._pa.open(
-            format=self._pa.get_format_from_width(sample_width),
-            channels=channels,
-            rate=sample_rate,
-            output=True,
-            output_device_index=self.output_device_index,
-        )
+        If acknowledge() is active, the response is cross-faded in on the
+        acknowledgement stream instead of opening a new one.
+        """
+        try:
+            raw_pcm = self._decode_mp3(mp3_bytes)
+        except Exception:
+            self.cancel_acknowledgement()
+            raise
 
-        # Write in chunks to avoid buffer overruns
-        chunk_size = 1024
-        for i in range(0, len(raw_pcm), chunk_size):
-            stream.write(raw_pcm[i : i + chunk_size])
+        if self._ack_thread is not None:
+            with self._ack_lock:
+                self._pending_response = raw_pcm
+            self._ack_wakeup.set()
+            self._ack_done.wait()
+            self._ack_thread.join()
+            self._ack_thread = None
+            if self._response_sound_at is None:
+                # The acknowledgement stream failed before reaching the response
+                self._play_pcm(raw_pcm)
+        else:
+            self._play_pcm(raw_pcm)
 
-        stream.stop_stream()
-        stream.close()
+        self._report_ttfs()
         print("[Playback] Done.")
 
     def play_wav_bytes(self, wav_bytes: bytes) -> None:
         """Alternative: play raw WAV bytes (useful for LINEAR16 TTS output)."""
+        self.cancel_acknowledgement()
         wav_io = io.BytesIO(wav_bytes)
         with wave.open(wav_io, "rb") as wf:
             stream = self._pa.open(
@@ -71,6 +152,151 @@ class AudioPlayer:
             stream.stop_stream()
             stream.close()
 
+    def _open_output(self):
+        return self._pa.open(
+            format=self._pa.get_format_from_width(2),
+            channels=1,
+            rate=PLAYBACK_SAMPLE_RATE,
+            output=True,
+            output_device_index=self.output_device_index,
+        )
+
+    def _play_pcm(self, raw_pcm: bytes) -> None:
+        """Play mono 16-bit PCM at PLAYBACK_SAMPLE_RATE on a fresh stream."""
+        stream = self._open_output()
+
+        # Write in chunks to avoid buffer overruns (memoryview: no per-chunk copies)
+        pcm_view = memoryview(raw_pcm)
+        for i in range(0, len(pcm_view), CHUNK_BYTES):
+            if self._response_sound_at is None:
+                self._response_sound_at = time.monotonic()
+            stream.write(pcm_view[i : i + CHUNK_BYTES])
+
+        stream.stop_stream()
+        stream.close()
+
+    def _ack_worker(self) -> None:
+        """Play earcon, then fillers, until the response arrives; then cross-fade into it."""
+        stream = None
+        try:
+            stream = self._open_output()
+            source = memoryview(self._earcon)
+            pos = 0
+            filler_index = 0
+            next_filler_at = self._ack_started + self.filler_deadline
+
+            while not self._ack_cancel.is_set():
+                with self._ack_lock:
+                    response = self._pending_response
+                if response is not None:
+                    self._write_response(stream, source[pos:], response)
+                    return
+
+                if pos < len(source):
+                    if self._first_sound_at is None:
+                        self._first_sound_at = time.monotonic()
+                    stream.write(source[pos : pos + CHUNK_BYTES])
+                    pos += CHUNK_BYTES
+                    continue
+
+                # Current sound finished and still no response
+                now = time.monotonic()
+                if self._fillers and now >= next_filler_at:
+                    source = memoryview(self._fillers[filler_index % len(self._fillers)])
+                    pos = 0
+                    filler_index += 1
+                    duration = len(source) / (2 * PLAYBACK_SAMPLE_RATE)
+                    next_filler_at = now + duration + self.filler_interval
+                    print("[Playback] Response late, playing filler.")
+                    continue
+
+                wait = next_filler_at - now if self._fillers else 0.05
+                self._ack_wakeup.wait(timeout=min(max(wait, 0.0), 0.05))
+                self._ack_wakeup.clear()
+        except Exception as e:
+            print(f"[Playback] Acknowledgement playback failed: {e}")
+        finally:
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+            self._ack_done.set()
+
+    def _write_response(self, stream, tail: memoryview, response: bytes) -> None:
+        """Cross-fade from whatever is still playing into the response, then play it."""
+        response = memoryview(response)
+        fade_bytes = int(PLAYBACK_SAMPLE_RATE * self.crossfade_ms / 1000) * 2
+        fade_bytes = min(fade_bytes, len(tail), len(response))
+        # pydub can't fade over less than 1 ms; just cut over instead
+        if fade_bytes >= PLAYBACK_SAMPLE_RATE * 2 // 1000:
+            first = _crossfade(tail[:fade_bytes], response[:fade_bytes])
+            pos = fade_bytes
+        else:
+            first = response[:CHUNK_BYTES]
+            pos = len(first)
+
+        write_started = time.monotonic()
+        stream.write(first)
+        # Only mark the response as playing once a write succeeded, so
+        # play_mp3_bytes() falls back to a fresh stream if this one failed
+        self._response_sound_at = write_started
+        if self._first_sound_at is None:
+            self._first_sound_at = write_started
+
+        for i in range(pos, len(response), CHUNK_BYTES):
+            if self._ack_cancel.is_set():
+                return
+            stream.write(response[i : i + CHUNK_BYTES])
+
+    def _report_ttfs(self) -> None:
+        """Log perceived vs. actual time-to-first-sound for this turn."""
+        if self._ack_started is None or self._response_sound_at is None:
+            return
+        response = self._response_sound_at - self._ack_started
+        perceived = (self._first_sound_at or self._response_sound_at) - self._ack_started
+        self.ttfs["perceived"].append(perceived)
+        self.ttfs["response"].append(response)
+        print(f"[Playback] Time to first sound: {perceived * 1000:.0f}ms "
+              f"(response audio at {response * 1000:.0f}ms) | medians: "
+              f"perceived {statistics.median(self.ttfs['perceived']) * 1000:.0f}ms, "
+              f"response {statistics.median(self.ttfs['response']) * 1000:.0f}ms")
+        self._ack_started = None
+
+    @staticmethod
+    def _decode_mp3(mp3_bytes: bytes) -> bytes:
+        # Decode MP3 -> raw PCM using pydub (requires ffmpeg)
+        audio_segment = AudioSegment.from_mp3(io.BytesIO(mp3_bytes))
+        return _normalize(audio_segment).raw_data
+
+    @staticmethod
+    def _load_earcon(path: str) -> bytes:
+        """Decode a custom earcon file, or synthesize a short two-note chime."""
+        if path:
+            return _normalize(AudioSegment.from_file(path)).raw_data
+        chime = (
+            Sine(880).to_audio_segment(duration=70, volume=-12).fade_out(20)
+            + Sine(1320).to_audio_segment(duration=90, volume=-12).fade_out(60)
+        )
+        return _normalize(chime).raw_data
+
     def __del__(self):
+        if getattr(self, "_ack_thread", None) is not None:
+            self.cancel_acknowledgement()
         if self._pa:
             self._pa.terminate()
+
+
+def _normalize(audio_segment: AudioSegment) -> AudioSegment:
+    """Mono 16-bit PCM at PLAYBACK_SAMPLE_RATE."""
+    audio_segment = audio_segment.set_channels(1)
+    audio_segment = audio_segment.set_sample_width(2)  # 16-bit
+    return audio_segment.set_frame_rate(PLAYBACK_SAMPLE_RATE)
+
+
+def _crossfade(fade_out_pcm, fade_in_pcm) -> bytes:
+    """Mix equal-length PCM: the first fades out while the second fades in."""
+    outgoing = AudioSegment(data=bytes(fade_out_pcm), sample_width=2,
+                            frame_rate=PLAYBACK_SAMPLE_RATE, channels=1)
+    incoming = AudioSegment(data=bytes(fade_in_pcm), sample_width=2,
+                            frame_rate=PLAYBACK_SAMPLE_RATE, channels=1)
+    duration = len(outgoing)
+    return outgoing.fade_out(duration).overlay(incoming.fade_in(duration)).raw_data
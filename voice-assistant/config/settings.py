@@ -31,6 +31,29 @@ class AudioConfig:
     SILENCE_FRAMES_THRESHOLD: int = int(os.getenv("SILENCE_FRAMES_THRESHOLD", "33"))
     # ~1 second of silence at 30ms frames = 33 frames
 
+    # Capture buffer bounds
+    # Hard cap on a single utterance, even if the VAD never hears silence
+    MAX_UTTERANCE_SECONDS: float = float(os.getenv("MAX_UTTERANCE_SECONDS", "30"))
+    # Audio kept in a preallocated in-memory region before spilling to an mmap'd temp file
+    CAPTURE_MEMORY_SECONDS: float = float(os.getenv("CAPTURE_MEMORY_SECONDS", "10"))
+    # Directory for the spill file (None = system temp dir)
+    CAPTURE_SPILL_DIR: str = os.getenv("CAPTURE_SPILL_DIR") or None
+
+    # Perceived-latency layer (earcon + filler phrases while a request is in flight)
+    EARCON_ENABLED: bool = os.getenv("EARCON_ENABLED", "true").lower() == "true"
+    # Optional sound file for the earcon (None = built-in chime)
+    EARCON_PATH: str = os.getenv("EARCON_PATH") or None
+    # Play a filler phrase if no response has started after this long
+    FILLER_DEADLINE_MS: int = int(os.getenv("FILLER_DEADLINE_MS", "1500"))
+    # Gap between repeated fillers while still waiting
+    FILLER_INTERVAL_MS: int = int(os.getenv("FILLER_INTERVAL_MS", "3000"))
+    # '|'-separated phrases, synthesized once at startup (empty disables fillers)
+    FILLER_PHRASES: list = [
+        p.strip() for p in os.getenv("FILLER_PHRASES", "One moment.|Let me think.").split("|")
+        if p.strip()
+    ]
+    CROSSFADE_MS: int = int(os.getenv("CROSSFADE_MS", "80"))
+
 
 class STTConfig:
     # Google Cloud STT
@@ -52,6 +75,33 @@ class AgentConfig:
     MODEL: str = os.getenv("CLAUDE_MODEL", "claude-haiku-4-5-20251001")
     MAX_TOKENS: int = int(os.getenv("CLAUDE_MAX_TOKENS", "1024"))
     MAX_HISTORY_TURNS: int = int(os.getenv("MAX_HISTORY_TURNS", "10"))
+    # Per-turn model routing: 'adaptive' picks a tier per turn, 'fixed' always
+    # uses MODEL with MAX_TOKENS
+    ROUTING_POLICY: str = os.getenv("ROUTING_POLICY", "adaptive")
+    # Quick tier: greetings, yes/no, short factual questions
+    MODEL_QUICK: str = os.getenv("CLAUDE_MODEL_QUICK", MODEL)
+    MAX_TOKENS_QUICK: int = int(os.getenv("CLAUDE_MAX_TOKENS_QUICK", "150"))
+    # Standard tier uses MODEL; cap it well below MAX_TOKENS for speech
+    MAX_TOKENS_STANDARD: int = int(os.getenv("CLAUDE_MAX_TOKENS_STANDARD", "250"))
+    # Deep tier: explanations, comparisons, planning. Still speech-sized, but
+    # never capped below the standard tier; set CLAUDE_MODEL_DEEP to a larger
+    # model (e.g. Sonnet) to opt in
+    MODEL_DEEP: str = os.getenv("CLAUDE_MODEL_DEEP", MODEL)
+    MAX_TOKENS_DEEP: int = int(os.getenv("CLAUDE_MAX_TOKENS_DEEP", "400"))
+    # Persistent conversation history (survives crashes and restarts)
+    HISTORY_PERSIST: bool = os.getenv("HISTORY_PERSIST", "true").lower() == "true"
+    HISTORY_DIR: str = os.getenv("HISTORY_DIR", str(_project_root / "history"))
+    HISTORY_SESSION: str = os.getenv("HISTORY_SESSION", "default")
+    # Max seconds between fsyncs of the turn log
+    HISTORY_FLUSH_INTERVAL: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+    # Write a compacted snapshot every N logged messages
+    HISTORY_SNAPSHOT_EVERY: int = int(os.getenv("HISTORY_SNAPSHOT_EVERY", "50"))
+    # Tool use
+    TOOLS_ENABLED: bool = os.getenv("TOOLS_ENABLED", "true").lower() == "true"
+    TOOL_TIMEOUT_SECONDS: float = float(os.getenv("TOOL_TIMEOUT_SECONDS", "3"))
+    TOOL_MAX_WORKERS: int = int(os.getenv("TOOL_MAX_WORKERS", "4"))
+    # Max tool_use -> tool_result round trips per user turn
+    MAX_TOOL_ROUNDS: int = int(os.getenv("MAX_TOOL_ROUNDS", "3"))
     SYSTEM_PROMPT: str = os.getenv(
         "SYSTEM_PROMPT",
         (
@@ -66,6 +116,8 @@ class AgentConfig:
 class TriggerConfig:
     MODE: str = os.getenv("TRIGGER_MODE", "keyboard")  # 'button' or 'keyboard'
     BUTTON_GPIO_PIN: int = int(os.getenv("BUTTON_GPIO_PIN", "17"))
+    # Seconds to keep listening for a follow-up after a reply (0 disables)
+    FOLLOW_UP_SECONDS: float = float(os.getenv("FOLLOW_UP_SECONDS", "5"))
 
 
 class Settings:
@@ -8,16 +8,20 @@ Loop:
   4. Send text to Claude -> get response
   5. Synthesize response -> audio (Google TTS)
   6. Play audio through speaker
-  7. Repeat
+  7. Listen for a follow-up for FOLLOW_UP_SECONDS on the open stream;
+     sustained speech starts a new turn at step 2, silence returns to step 1
 
 Special commands (spoken):
   "reset conversation" -> clears Claude's history
   "goodbye" / "quit"   -> exits the program
 """
+import collections
+import statistics
 import sys
 import time
 
 from config.settings import settings
+from audio.buffer import peak_rss_kb
 from audio.capture import AudioCapture
 from audio.playback import AudioPlayer
 from speech.stt import SpeechToText
@@ -28,13 +32,16 @@ from io.trigger import get_trigger
 
 QUIT_PHRASES = {"goodbye", "quit", "exit", "stop", "shut down"}
 RESET_PHRASES = {"reset", "reset conversation", "clear history", "start over", "new conversation"}
+# Recent turns kept for the running time-to-listening medians
+LATENCY_SAMPLES = 100
 
 
 def main():
     print("=" * 60)
     print("ReSpeaker Voice Assistant")
-    print(f"Model: {settings.agent.MODEL}")
+    print(f"Model: {settings.agent.MODEL} (routing: {settings.agent.ROUTING_POLICY})")
     print(f"Trigger: {settings.trigger.MODE}")
+    print(f"Follow-up window: {settings.trigger.FOLLOW_UP_SECONDS}s")
     print("=" * 60)
 
     # Initialize all components (fails fast if credentials missing)
@@ -49,22 +56,63 @@ def main():
         print(f"[FATAL] Failed to initialize: {e}")
         sys.exit(1)
 
+    _load_fillers(tts, player)
+
     print("\n[Ready] Voice assistant is running.")
     print("Speak after the trigger. Say 'goodbye' to exit.\n")
 
+    follow_up_window = settings.trigger.FOLLOW_UP_SECONDS
+    follow_up = False
+    # Time to be listening, per turn kind: from the trigger press (triggered)
+    # or the end of the previous reply (follow-up) until recording starts
+    latencies = {
+        "triggered": collections.deque(maxlen=LATENCY_SAMPLES),
+        "follow-up": collections.deque(maxlen=LATENCY_SAMPLES),
+    }
+    playback_end = None
+
     while True:
         try:
-            # Step 1: Wait for user to initiate
-            trigger.wait_for_trigger()
+            # Step 1: Wait for user to initiate, unless a follow-up window is open
+            turn_kind = "follow-up" if follow_up else "triggered"
+            if follow_up:
+                follow_up = False
+                print(f"[Main] Listening for a follow-up ({follow_up_window:.0f}s)...")
+                audio_bytes = capture.record_utterance(timeout=follow_up_window)
+                _report_latency(latencies, turn_kind,
+                                capture.listening_since - playback_end)
+                if audio_bytes is None:
+                    print("[Main] Follow-up window closed.")
+                    continue
+            else:
+                trigger.wait_for_trigger()
+                triggered_at = time.monotonic()
+
+                # Step 2: Record until silence
+                audio_bytes = capture.record_utterance()
+                _report_latency(latencies, turn_kind,
+                                capture.listening_since - triggered_at)
 
-            # Step 2: Record until silence
-            audio_bytes = capture.record_utterance()
             if len(audio_bytes) < 1000:
                 print("[Main] Audio too short, ignoring.")
                 continue
 
+            # A follow-up that ran to MAX_UTTERANCE_SECONDS is most likely
+            # background noise (TV, fan); answer it, but don't reopen the
+            # window afterwards or the noise could keep the loop going forever
+            reopen = follow_up_window > 0 and not (
+                turn_kind == "follow-up" and capture.last_stats["capped"]
+            )
+
+            # Let the user know we heard them while STT/Claude/TTS run
+            player.acknowledge()
+
             # Step 3: Speech to Text
-            transcript = stt.transcribe(audio_bytes)
+            transcript = stt.transcribe(audio_bytes, stats=capture.last_stats)
+            # Re-read the peak so it covers the same span as the copy count
+            capture.last_stats["peak_rss_kb"] = peak_rss_kb()
+            print(f"[Main] Utterance copies this turn: {capture.last_stats['copies']}, "
+                  f"peak RSS {capture.last_stats['peak_rss_kb']} KB")
             if not transcript:
                 print("[Main] No transcript, looping back.")
                 _speak_error(tts, player, "Sorry, I didn't catch that.")
@@ -84,6 +132,8 @@ def main():
                 agent.reset_history()
                 reset_audio = tts.synthesize("Conversation reset. How can I help you?")
                 player.play_mp3_bytes(reset_audio)
+                playback_end = time.monotonic()
+                follow_up = reopen
                 continue
 
             # Step 4: Claude agent
@@ -93,26 +143,52 @@ def main():
             # Step 5 + 6: TTS and playback
             audio_response = tts.synthesize(response_text)
             player.play_mp3_bytes(audio_response)
+            playback_end = time.monotonic()
+
+            # Step 7: Keep listening for a follow-up; history carries over
+            follow_up = reopen
 
         except KeyboardInterrupt:
             print("\n[Main] Keyboard interrupt received. Shutting down.")
             break
         except Exception as e:
             print(f"[Main] Error in main loop: {e}")
+            player.cancel_acknowledgement()
             # Don't crash the loop on transient errors
             time.sleep(1)
             continue
 
+    agent.close()
     print("[Main] Shutdown complete.")
 
 
+def _report_latency(latencies: dict, kind: str, seconds: float):
+    """Log this turn's time-to-listening alongside the running medians per turn kind."""
+    latencies[kind].append(seconds)
+    medians = ", ".join(
+        f"{k} {statistics.median(v) * 1000:.1f}ms (n={len(v)})"
+        for k, v in latencies.items() if v
+    )
+    print(f"[Main] {kind} turn: listening after {seconds * 1000:.1f}ms | "
+          f"medians: {medians}")
+
+
+def _load_fillers(tts: TextToSpeech, player: AudioPlayer):
+    """Synthesize filler phrases once at startup; fillers are skipped if this fails."""
+    try:
+        player.load_fillers([tts.synthesize(p) for p in settings.audio.FILLER_PHRASES])
+    except Exception as e:
+        print(f"[Main] Could not prepare filler phrases: {e}")
+
+
 def _speak_error(tts: TextToSpeech, player: AudioPlayer, message: str):
     """Utility to speak an error message without crashing."""
     try:
         audio = tts.synthesize(message)
         player.play_mp3_bytes(audio)
     except Exception:
-        pass  # Best-effort; don't recurse on error
+        # Best-effort: don't recurse on error, but stop any earcon/filler
+        player.cancel_acknowledgement()
 
 
 if __name__ == "__main__":
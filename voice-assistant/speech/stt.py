@@ -30,19 +30,29 @@ class SpeechToText:
             use_enhanced=True,
         )
 
-    def transcribe(self, pcm_audio: bytes) -> str:
+    def transcribe(self, pcm_audio, stats: dict = None) -> str:
         """
         Transcribe a complete audio utterance.
 
         Args:
-            pcm_audio: Raw 16-bit mono PCM bytes at 16000 Hz
+            pcm_audio: Raw 16-bit mono PCM at 16000 Hz, as bytes or any
+                bytes-like object (e.g. the memoryview from AudioCapture)
+            stats: Per-turn stats dict (AudioCapture.last_stats); the copy
+                made here is added to its "copies" count
 
         Returns:
             Transcript string, or empty string if nothing recognized.
         """
-        audio = speech.RecognitionAudio(content=pcm_audio)
+        # The protobuf field needs real bytes; this is the one unavoidable
+        # copy of the utterance between capture and the network.
+        copied = not isinstance(pcm_audio, bytes)
+        content = bytes(pcm_audio) if copied else pcm_audio
+        if copied and stats is not None:
+            stats["copies"] = stats.get("copies", 0) + 1
+        audio = speech.RecognitionAudio(content=content)
 
-        print(f"[STT] Sending {len(pcm_audio)} bytes to Google STT...")
+        print(f"[STT] Sending {len(content)} bytes to Google STT"
+              f"{' (1 copy)' if copied else ''}...")
         response = self.client.recognize(
             config=self.recognition_config, audio=audio
         )
@@ -29,6 +29,48 @@ def test_record_utterance():
     print(f"Saved to {output_path}")
     print(f"Verify with: aplay {output_path}")
 
+def test_record_with_timeout():
+    cap = AudioCapture()
+    print("\nStay silent for 3 seconds...")
+    audio = cap.record_utterance(timeout=3)
+    assert audio is None, f"Expected no utterance, got {len(audio)} bytes"
+    print("Now speak within 5 seconds (stream is reused)...")
+    audio = cap.record_utterance(timeout=5)
+    assert audio is not None, "Expected speech within the window"
+    print(f"Recorded {len(audio)} bytes, stream ready in "
+          f"{cap.last_stats['stream_ready_ms']}ms")
+
+class _ScriptedStream:
+    """Stands in for the PyAudio input stream; is_speech comes from the frame's first byte."""
+    def __init__(self, voiced):
+        self.frames = [bytes([v]) * 960 for v in voiced]
+    def read(self, n, exception_on_overflow=True):
+        return self.frames.pop(0) if self.frames else b"\x00" * 960
+    def is_stopped(self):
+        return False
+    def stop_stream(self):
+        pass
+    def close(self):
+        pass
+
+class _FirstByteVad:
+    def is_speech(self, frame, sample_rate):
+        return frame[0] == 1
+
+def test_follow_up_needs_sustained_speech():
+    cap = AudioCapture()
+    cap._vad = _FirstByteVad()
+    # Isolated voiced frames (TV, fan) every few frames: no onset
+    cap._stream = _ScriptedStream([1, 0, 0, 0] * 20)
+    assert cap.record_utterance(timeout=0.5) is None
+    # Sustained speech: recorded
+    cap._stream = _ScriptedStream([0] * 5 + [1] * 20)
+    audio = cap.record_utterance(timeout=0.5)
+    assert audio is not None and len(audio) > 0
+    print(f"Sustained onset recorded {len(audio)} bytes")
+
 if __name__ == "__main__":
     test_list_devices()
     test_record_utterance()
+    test_record_with_timeout()
+    test_follow_up_needs_sustained_speech()
@@ -0,0 +1,48 @@
+"""
+Test the bounded capture buffer (no audio hardware needed).
+"""
+import sys
+sys.path.insert(0, "/home/respeaker/voice-assistant")
+
+from audio.buffer import CaptureBuffer
+
+FRAME = b"\x01\x02" * 480  # one 30ms frame at 16kHz mono
+
+def test_in_memory_view():
+    buf = CaptureBuffer(memory_bytes=len(FRAME) * 4, max_bytes=len(FRAME) * 8)
+    assert buf.extend([FRAME, FRAME])
+    view = buf.view()
+    assert isinstance(view, memoryview)
+    assert view.tobytes() == FRAME * 2
+    assert not buf.spilled and buf.copies == 0
+    print("In-memory view test PASSED")
+
+def test_spill_to_mmap():
+    buf = CaptureBuffer(memory_bytes=len(FRAME) * 2, max_bytes=len(FRAME) * 8)
+    assert buf.extend([FRAME] * 5)
+    assert buf.spilled and buf.copies == 1
+    assert buf.view().tobytes() == FRAME * 5
+    buf.reset()
+    assert len(buf) == 0 and not buf.spilled
+    print("Spill test PASSED")
+
+def test_hard_cap():
+    buf = CaptureBuffer(memory_bytes=len(FRAME), max_bytes=len(FRAME) * 3 + 10)
+    assert buf.extend([FRAME] * 3)
+    assert not buf.append(FRAME)
+    assert buf.full and len(buf) == len(FRAME) * 3 + 10
+    print("Hard cap test PASSED")
+
+def test_reset_with_outstanding_view():
+    buf = CaptureBuffer(memory_bytes=len(FRAME), max_bytes=len(FRAME) * 4)
+    buf.extend([FRAME] * 3)
+    view = buf.view()
+    buf.reset()  # must not raise while the caller still holds the view
+    assert view.tobytes() == FRAME * 3
+    print("Outstanding view test PASSED")
+
+if __name__ == "__main__":
+    test_in_memory_view()
+    test_spill_to_mmap()
+    test_hard_cap()
+    test_reset_with_outstanding_view()
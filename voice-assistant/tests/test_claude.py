@@ -2,25 +2,121 @@
 Test Claude agent integration with a simple exchange.
 """
 import sys
+import tempfile
+from types import SimpleNamespace
 sys.path.insert(0, "/home/respeaker/voice-assistant")
 
+from config.settings import settings
 from agent.claude_agent import ClaudeAgent
+from agent.tools import ToolRegistry
+
+
+class _FakeStream:
+    """Stands in for client.messages.stream(...) with a canned final message."""
+    def __init__(self, message):
+        self._message = message
+        self.text_stream = iter([b.text for b in message.content if b.type == "text"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return self._message
 
 def test_single_turn():
-    agent = ClaudeAgent()
+    agent = ClaudeAgent(persist=False)
     response = agent.chat("What is the capital of France?")
     assert "Paris" in response, f"Expected Paris in response, got: {response}"
     print(f"Response: {response}")
     print("Claude single-turn test PASSED")
 
 def test_multi_turn_memory():
-    agent = ClaudeAgent()
+    agent = ClaudeAgent(persist=False)
     agent.chat("My name is Alex.")
     response = agent.chat("What is my name?")
     assert "Alex" in response, f"Expected Alex in response, got: {response}"
     print(f"Memory test response: {response}")
     print("Claude multi-turn memory test PASSED")
 
+def test_tool_use_loop_offline():
+    registry = ToolRegistry(max_workers=2, default_timeout=1)
+    registry.register("get_temperature", "", {"type": "object"}, lambda room: f"21C in {room}")
+
+    responses = [
+        SimpleNamespace(stop_reason="tool_use", content=[
+            SimpleNamespace(type="text", text="Let me check."),
+            SimpleNamespace(type="tool_use", id="toolu_1", name="get_temperature",
+                            input={"room": "kitchen"}),
+        ]),
+        SimpleNamespace(stop_reason="end_turn", content=[
+            SimpleNamespace(type="text", text="It's 21 degrees in the kitchen."),
+        ]),
+    ]
+    requests = []
+
+    def stream(**kwargs):
+        # Snapshot the messages: the agent keeps appending to the same list
+        requests.append(dict(kwargs, messages=list(kwargs["messages"])))
+        return _FakeStream(responses.pop(0))
+
+    agent = ClaudeAgent(tools=registry, persist=False)
+    agent.client = SimpleNamespace(messages=SimpleNamespace(stream=stream))
+    response = agent.chat("How warm is the kitchen?")
+
+    assert response == "It's 21 degrees in the kitchen.", response
+    assert len(requests) == 2 and requests[0]["tools"][0]["name"] == "get_temperature"
+    tool_result = requests[1]["messages"][-1]
+    assert tool_result["role"] == "user"
+    assert tool_result["content"] == [{"type": "tool_result", "tool_use_id": "toolu_1",
+                                       "content": "21C in kitchen"}]
+    # Only the spoken exchange is kept in history
+    assert agent._history == [
+        {"role": "user", "content": "How warm is the kitchen?"},
+        {"role": "assistant", "content": response},
+    ]
+    agent.close()
+    print("Claude tool-use loop test PASSED")
+
+def test_tool_rounds_exhausted_offline():
+    registry = ToolRegistry(max_workers=2, default_timeout=1)
+    registry.register("get_temperature", "", {"type": "object"}, lambda room: f"21C in {room}")
+
+    def stream(**kwargs):
+        # Claude keeps asking for the tool and never answers
+        return _FakeStream(SimpleNamespace(stop_reason="tool_use", content=[
+            SimpleNamespace(type="text", text="Let me check."),
+            SimpleNamespace(type="tool_use", id="toolu_1", name="get_temperature",
+                            input={"room": "kitchen"}),
+        ]))
+
+    agent = ClaudeAgent(tools=registry, persist=False)
+    agent.client = SimpleNamespace(messages=SimpleNamespace(stream=stream))
+    agent.max_tool_rounds = 1
+    response = agent.chat("How warm is the kitchen?")
+
+    assert response == "Sorry, I couldn't finish that.", response
+    assert agent._history[-1] == {"role": "assistant", "content": response}
+    agent.close()
+    print("Claude tool rounds exhausted test PASSED")
+
+def test_unwritable_history_dir_offline():
+    with tempfile.NamedTemporaryFile() as f:
+        # A regular file where the history directory should be
+        settings.agent.HISTORY_DIR, saved = f.name, settings.agent.HISTORY_DIR
+        try:
+            agent = ClaudeAgent(tools=ToolRegistry(), persist=True)
+        finally:
+            settings.agent.HISTORY_DIR = saved
+    assert agent.store is None and agent.turn_count == 0
+    agent.close()
+    print("Claude unwritable history dir test PASSED")
+
 if __name__ == "__main__":
     test_single_turn()
     test_multi_turn_memory()
+    test_tool_use_loop_offline()
+    test_tool_rounds_exhausted_offline()
+    test_unwritable_history_dir_offline()
@@ -0,0 +1,133 @@
+"""
+Test the persistent conversation store, plus restore/write benchmarks.
+No network access needed.
+"""
+import sys
+import tempfile
+import time
+sys.path.insert(0, "/home/respeaker/voice-assistant")
+
+from agent.history_store import ConversationStore
+
+def _turn(i):
+    return ({"role": "user", "content": f"question {i}"},
+            {"role": "assistant", "content": f"answer {i}"})
+
+def test_restore_after_close():
+    with tempfile.TemporaryDirectory() as d:
+        store = ConversationStore(d, keep_messages=4, snapshot_every=3)
+        assert store.restore() == []
+        for i in range(5):
+            store.append(*_turn(i))
+        store.close()
+
+        restored = ConversationStore(d, keep_messages=4).restore()
+        assert [m["content"] for m in restored] == \
+            ["question 3", "answer 3", "question 4", "answer 4"]
+    print("Restore test PASSED")
+
+def test_reset_and_torn_tail():
+    with tempfile.TemporaryDirectory() as d:
+        store = ConversationStore(d, keep_messages=10)
+        store.restore()
+        store.append(*_turn(0))
+        store.reset()
+        store.append(*_turn(1))
+        store.close()
+
+        # Simulate a crash in the middle of a write
+        with open(store.log_path, "ab") as f:
+            f.write(b'{"role": "user", "cont')
+
+        reopened = ConversationStore(d, keep_messages=10)
+        assert [m["content"] for m in reopened.restore()] == ["question 1", "answer 1"]
+        reopened.append(*_turn(2))
+        reopened.close()
+        assert len(ConversationStore(d, keep_messages=10).restore()) == 4
+    print("Reset / torn tail test PASSED")
+
+def test_compaction_rotates_log():
+    with tempfile.TemporaryDirectory() as d:
+        store = ConversationStore(d, keep_messages=4, snapshot_every=10)
+        store.restore()
+        for i in range(50):
+            store.append(*_turn(i))
+            time.sleep(0.001)
+        store.close()
+        segments = list(store.path.glob("turns.*.log"))
+        assert len(segments) == 1, f"Old segments not removed: {segments}"
+        assert store.stats["snapshots"] >= 1
+        restored = ConversationStore(d, keep_messages=4).restore()
+        assert restored[-1]["content"] == "answer 49"
+    print("Compaction test PASSED")
+
+def test_write_error_keeps_writer_alive():
+    with tempfile.TemporaryDirectory() as d:
+        store = ConversationStore(d, keep_messages=10)
+        store.restore()
+        real_log = store._log
+
+        class FailingLog:
+            def write(self, data):
+                raise OSError(28, "No space left on device")
+            def __getattr__(self, name):
+                return getattr(real_log, name)
+
+        store._log = FailingLog()
+        store.append(*_turn(0))
+        time.sleep(0.1)
+        store._log = real_log
+        store.append(*_turn(1))
+        store.close()
+        assert store.stats["errors"] >= 1
+        restored = ConversationStore(d, keep_messages=10).restore()
+        assert [m["content"] for m in restored] == ["question 1", "answer 1"]
+    print("Write error test PASSED")
+
+def bench_write_throughput(turns: int = 100_000):
+    with tempfile.TemporaryDirectory() as d:
+        # Unbounded queue: this enqueues far faster than any disk can absorb
+        store = ConversationStore(d, keep_messages=20, flush_interval=0.05,
+                                  snapshot_every=50, queue_limit=0)
+        store.restore()
+        start = time.monotonic()
+        for i in range(turns):
+            store.append(*_turn(i))
+        enqueue = time.monotonic() - start
+        store.close()
+        total = time.monotonic() - start
+        print(f"Write: {turns * 2} messages, enqueue {enqueue * 1e6 / (turns * 2):.1f}us/msg, "
+              f"{turns * 2 / total:.0f} msg/s to disk, stats={store.stats}")
+
+def bench_restore(sizes=(1_000, 100_000)):
+    timings = {}
+    for turns in sizes:
+        with tempfile.TemporaryDirectory() as d:
+            store = ConversationStore(d, keep_messages=20, snapshot_every=50, queue_limit=0)
+            store.restore()
+            for i in range(turns):
+                store.append(*_turn(i))
+            store.close()
+
+            start = time.monotonic()
+            restored = ConversationStore(d, keep_messages=20).restore()
+            timings[turns] = time.monotonic() - start
+            assert restored[-1]["content"] == f"answer {turns - 1}"
+    for turns, seconds in timings.items():
+        print(f"Restore: {turns} turns in log -> {seconds * 1000:.2f}ms")
+    return timings
+
+def test_restore_time_independent_of_log_size():
+    timings = bench_restore()
+    small, large = timings[1_000], timings[100_000]
+    assert large < max(small * 10, 0.05), \
+        f"Restore scaled with log size: {small * 1000:.2f}ms -> {large * 1000:.2f}ms"
+    print("Restore benchmark PASSED")
+
+if __name__ == "__main__":
+    test_restore_after_close()
+    test_reset_and_torn_tail()
+    test_compaction_rotates_log()
+    test_write_error_keeps_writer_alive()
+    bench_write_throughput()
+    bench_restore()
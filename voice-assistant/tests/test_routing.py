@@ -0,0 +1,101 @@
+"""
+Test per-turn model routing.
+
+test_route_decisions runs offline. test_adaptive_vs_fixed runs a held-out
+prompt set through both policies against the live API and compares median
+latency, checking each answer still contains the expected keyword.
+"""
+import statistics
+import sys
+import time
+sys.path.insert(0, "/home/respeaker/voice-assistant")
+
+from agent.claude_agent import ClaudeAgent, ModelRouter
+from agent.tools import LATENCY_SAMPLES
+
+# (prompt, expected tier) for the offline routing check
+ROUTING_CASES = [
+    ("Is the sun a star?", "quick"),
+    ("Hello there", "quick"),
+    ("Write it down", "quick"),
+    ("What is the capital of Japan?", "standard"),
+    ("How many legs does a spider have?", "standard"),
+    ("How do I turn on the lights", "standard"),
+    ("Explain how a rainbow forms", "deep"),
+    ("Why is the sky blue?", "deep"),
+    ("How does a compiler work?", "deep"),
+    ("Write me a short story about a dragon", "deep"),
+]
+
+# (prompt, keyword a correct answer must contain); kept separate from
+# ROUTING_CASES so the routing rules weren't tuned on the latency set
+HELD_OUT_PROMPTS = [
+    ("Is a tomato a fruit?", "yes"),
+    ("Is the Pacific the largest ocean?", "yes"),
+    ("What is the capital of Australia?", "Canberra"),
+    ("How many days are in a leap year?", "366"),
+    ("What is the chemical symbol for gold?", "Au"),
+    ("Why do leaves change color in autumn?", "chlorophyll"),
+    ("Explain what causes the tides", "moon"),
+]
+
+def test_route_decisions():
+    router = ModelRouter(policy="adaptive")
+    for prompt, expected in ROUTING_CASES:
+        router.reset()
+        tier = router.route(prompt).tier.name
+        assert tier == expected, f"{prompt!r}: expected {expected}, got {tier}"
+    print("Routing decisions test PASSED")
+
+def test_deep_thread_follow_up():
+    router = ModelRouter(policy="adaptive")
+    router.route("Explain how compilers work")
+    assert router.route("And the linker?").tier.name == "deep"
+    print("Deep follow-up routing test PASSED")
+
+def test_small_talk_after_deep_turn():
+    router = ModelRouter(policy="adaptive")
+    router.route("Explain how vaccines work")
+    assert router.route("Thanks").tier.name == "quick"
+    router.route("Explain how vaccines work")
+    assert router.route("What time is it?").tier.name == "quick"
+    print("Small talk after deep turn test PASSED")
+
+def test_fixed_policy():
+    router = ModelRouter(policy="fixed")
+    assert router.route("Hello").tier.name == "fixed"
+    print("Fixed policy test PASSED")
+
+def test_latency_history_is_bounded():
+    router = ModelRouter(policy="fixed")
+    decision = router.route("Hello")
+    for _ in range(LATENCY_SAMPLES + 5):
+        router.record(decision, 0.1)
+    assert len(router.latencies["fixed"]) == LATENCY_SAMPLES
+    print("Bounded latency history test PASSED")
+
+def test_adaptive_vs_fixed():
+    results = {}
+    for policy in ("fixed", "adaptive"):
+        latencies = []
+        for prompt, keyword in HELD_OUT_PROMPTS:
+            agent = ClaudeAgent(router=ModelRouter(policy=policy), persist=False)
+            start = time.monotonic()
+            response = agent.chat(prompt)
+            latencies.append(time.monotonic() - start)
+            assert keyword.lower() in response.lower(), \
+                f"[{policy}] {prompt!r}: expected {keyword!r}, got: {response}"
+        results[policy] = statistics.median(latencies)
+        print(f"{policy}: median {results[policy]:.2f}s")
+    print(f"Adaptive vs fixed median: {results['adaptive']:.2f}s vs {results['fixed']:.2f}s")
+    # Allow 10% for network jitter; adaptive must not be slower than that
+    assert results["adaptive"] <= results["fixed"] * 1.1, \
+        f"Adaptive routing slower: {results['adaptive']:.2f}s vs {results['fixed']:.2f}s"
+
+if __name__ == "__main__":
+    test_route_decisions()
+    test_deep_thread_follow_up()
+    test_small_talk_after_deep_turn()
+    test_fixed_policy()
+    test_latency_history_is_bounded()
+    test_adaptive_vs_fixed()
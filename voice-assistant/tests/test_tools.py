@@ -0,0 +1,91 @@
+"""
+Test the tool registry: concurrency, timeouts and result caching.
+No network access needed.
+"""
+import sys
+import time
+from types import SimpleNamespace
+sys.path.insert(0, "/home/respeaker/voice-assistant")
+
+from agent.tools import ToolRegistry
+
+def _tool_use(name, tool_input=None, id="toolu_1"):
+    return SimpleNamespace(type="tool_use", id=id, name=name, input=tool_input or {})
+
+def test_parallel_execution():
+    registry = ToolRegistry(max_workers=4, default_timeout=2)
+    registry.register("slow_a", "", {"type": "object"}, lambda: time.sleep(0.3) or "a")
+    registry.register("slow_b", "", {"type": "object"}, lambda: time.sleep(0.3) or "b")
+    start = time.monotonic()
+    results = registry.run([_tool_use("slow_a", id="1"), _tool_use("slow_b", id="2")])
+    elapsed = time.monotonic() - start
+    assert [r["content"] for r in results] == ["a", "b"]
+    assert elapsed < 0.5, f"Tools ran serially ({elapsed:.2f}s)"
+    print("Parallel tools test PASSED")
+
+def test_timeout_does_not_block():
+    registry = ToolRegistry(max_workers=2)
+    registry.register("stuck", "", {"type": "object"}, lambda: time.sleep(2) or "late", timeout=0.2)
+    registry.register("fast", "", {"type": "object"}, lambda: "ok")
+    start = time.monotonic()
+    results = registry.run([_tool_use("stuck", id="1"), _tool_use("fast", id="2")])
+    assert time.monotonic() - start < 1.0
+    assert results[0].get("is_error") and results[1]["content"] == "ok"
+    print("Tool timeout test PASSED")
+
+def test_cache_ttl():
+    calls = []
+    registry = ToolRegistry(default_timeout=1)
+    registry.register("lookup", "", {"type": "object"},
+                      lambda city: calls.append(city) or f"sunny in {city}", cache_ttl=0.2)
+    for _ in range(3):
+        registry.run([_tool_use("lookup", {"city": "Paris"})])
+    assert len(calls) == 1, f"Expected 1 call, got {len(calls)}"
+    time.sleep(0.25)
+    registry.run([_tool_use("lookup", {"city": "Paris"})])
+    assert len(calls) == 2, "Expected cache entry to expire"
+    print("Tool cache test PASSED")
+
+def test_hung_tool_fails_fast():
+    registry = ToolRegistry(max_workers=2)
+    registry.register("sensor", "", {"type": "object"}, lambda: time.sleep(1) or "late", timeout=0.1)
+    registry.register("fast", "", {"type": "object"}, lambda: "ok")
+    registry.run([_tool_use("sensor")])
+    start = time.monotonic()
+    results = registry.run([_tool_use("sensor", id="1"), _tool_use("fast", id="2")])
+    assert time.monotonic() - start < 0.1, "Hung tool should fail fast"
+    assert results[0].get("is_error") and results[1]["content"] == "ok"
+    print("Hung tool test PASSED")
+
+def test_saturated_pool_fails_fast():
+    registry = ToolRegistry(max_workers=1)
+    registry.register("hang", "", {"type": "object"}, lambda: time.sleep(1), timeout=0.1)
+    registry.register("fast", "", {"type": "object"}, lambda: "ok")
+    registry.run([_tool_use("hang")])
+    start = time.monotonic()
+    results = registry.run([_tool_use("fast")])
+    assert time.monotonic() - start < 0.1 and results[0].get("is_error")
+    print("Saturated pool test PASSED")
+
+def test_timeout_counts_from_start():
+    # Two 0.15s calls on one worker: the second queues but still gets its full timeout
+    registry = ToolRegistry(max_workers=1)
+    registry.register("a", "", {"type": "object"}, lambda: time.sleep(0.15) or "a", timeout=0.25)
+    registry.register("b", "", {"type": "object"}, lambda: time.sleep(0.15) or "b", timeout=0.25)
+    results = registry.run([_tool_use("a", id="1"), _tool_use("b", id="2")])
+    assert [r["content"] for r in results] == ["a", "b"], results
+    print("Timeout-from-start test PASSED")
+
+def test_unknown_tool():
+    results = ToolRegistry().run([_tool_use("nope")])
+    assert results[0]["is_error"]
+    print("Unknown tool test PASSED")
+
+if __name__ == "__main__":
+    test_parallel_execution()
+    test_timeout_does_not_block()
+    test_cache_ttl()
+    test_hung_tool_fails_fast()
+    test_saturated_pool_fails_fast()
+    test_timeout_counts_from_start()
+    test_unknown_tool()
@@ -21,5 +21,23 @@ def test_tts_playback():
     player.play_mp3_bytes(audio_bytes)
     print("Playback test PASSED")
 
+def test_acknowledgement_playback():
+    import time
+    from audio.playback import AudioPlayer
+    from speech.tts import TextToSpeech
+    tts = TextToSpeech()
+    player = AudioPlayer()
+    player.load_fillers([tts.synthesize("One moment.")])
+    response = tts.synthesize("Here is the answer, cross-faded in after the filler.")
+
+    print("Expect: chime, filler, then the answer...")
+    player.acknowledge()
+    time.sleep(player.filler_deadline + 0.5)  # simulate a slow request
+    player.play_mp3_bytes(response)
+    perceived, actual = player.ttfs["perceived"][-1], player.ttfs["response"][-1]
+    assert perceived < actual, "Expected the earcon before the response"
+    print(f"First sound {perceived * 1000:.0f}ms vs response {actual * 1000:.0f}ms. PASSED")
+
 if __name__ == "__main__":
     test_tts_playback()
+    test_acknowledgement_playback()